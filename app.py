@@ -1,9 +1,9 @@
+import os
+import re
+
 import streamlit as st
+import numpy as np
 import pandas as pd
-import plotly.express as px
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 from datetime import datetime, date
 #
 # =====================================================
@@ -18,14 +18,34 @@ st.set_page_config(
 FILE_PATH = "MIS_REPORTING_CHART.xlsx"
 ALERT_THRESHOLD = 40.0
 
+BAND_BINS = [-np.inf, 50, 70, np.inf]
+BAND_LABELS = ["Low", "Medium", "High"]
+
 # =====================================================
 # LOGIN SYSTEM
 # =====================================================
+# SHA-256 digests of the passwords; compared constant-time so no plaintext
+# sits in the source and mismatches don't short-circuit per character
 USERS = {
-    "admin": {"password": "admin123", "role": "Admin"},
-    "bank": {"password": "bank123", "role": "Bank"}
+    "admin": {
+        "password_sha256": bytes.fromhex(
+            "240be518fabd2724ddb6f04eeb1da5967448d7e831c08c8fa822809f74c720a9"),
+        "role": "Admin"
+    },
+    "bank": {
+        "password_sha256": bytes.fromhex(
+            "0595d0fa0f6b716e4f3e4989f915f874b2851de2feb32c43e5b5aa6ee15409b6"),
+        "role": "Bank"
+    }
 }
 
+def check_login(username, password):
+    import hashlib
+    import hmac
+    rec = USERS.get(username)
+    return rec is not None and hmac.compare_digest(
+        rec["password_sha256"], hashlib.sha256(password.encode()).digest())
+
 if "login" not in st.session_state:
     st.session_state.login = False
 
@@ -35,7 +55,7 @@ if not st.session_state.login:
     p = st.text_input("Password", type="password")
 
     if st.button("Login"):
-        if u in USERS and USERS[u]["password"] == p:
+        if check_login(u, p):
             st.session_state.login = True
             st.session_state.role = USERS[u]["role"]
             st.rerun()
@@ -45,30 +65,12 @@ if not st.session_state.login:
 
 st.sidebar.success(f"Logged in as {st.session_state.role}")
 
-# =====================================================
-# LOAD DATA SAFELY
-# =====================================================
-df = pd.read_excel(FILE_PATH)
-df.columns = df.columns.str.lower().str.strip()
-
-def find_col(keys):
-    for c in df.columns:
-        for k in keys:
-            if k in c:
-                return c
-    return None
-
-df = df.rename(columns={
-    find_col(["bank"]): "bank",
-    find_col(["model"]): "model",
-    find_col(["predicted"]): "predicted",
-    find_col(["confirmed"]): "confirmed",
-    find_col(["accuracy"]): "accuracy",
-    find_col(["date"]): "date"
-})
+# Imported after the login gate: the login screen never renders charts,
+# so it shouldn't pay the plotly import on cold start
+import plotly.express as px
 
 # =====================================================
-# FORCE CREATE REQUIRED COLUMNS (🔥 FIX)
+# LOAD DATA SAFELY (CACHED)
 # =====================================================
 REQUIRED_COLUMNS = {
     "predicted": 0,
@@ -78,22 +80,136 @@ REQUIRED_COLUMNS = {
     "alert_date": pd.NaT
 }
 
-for col, default in REQUIRED_COLUMNS.items():
-    if col not in df.columns:
-        df[col] = default
+# Substrings used to locate each logical field in the sheet headers
+FIELD_KEYS = {
+    "bank": ("bank",),
+    "model": ("model",),
+    "predicted": ("predicted",),
+    "confirmed": ("confirmed",),
+    "accuracy": ("accuracy",),
+    "date": ("date",)
+}
+
+# Compiled once; each alternation matches any of the field's keywords
+FIELD_PATTERNS = {
+    field: re.compile("|".join(map(re.escape, keys)))
+    for field, keys in FIELD_KEYS.items()
+}
+
+# Columns the admin save path persists beyond the mapped fields
+EXTRA_KEYS = ("status", "alert")
+
+def _wanted_col(name):
+    # usecols callable: keep only headers matching a known field keyword
+    c = str(name).lower()
+    return (any(k in c for keys in FIELD_KEYS.values() for k in keys)
+            or any(k in c for k in EXTRA_KEYS))
+
+def _parse_excel(path):
+    df = pd.read_excel(path, engine="calamine", sheet_name=0,
+                       usecols=_wanted_col)
+    # Rename via dict so already-clean headers don't allocate a new Index
+    df.rename(columns={c: c.lower().strip() for c in df.columns
+                       if isinstance(c, str) and c != c.lower().strip()},
+              inplace=True)
+
+    # Headers are lowercased/stripped once above, so each field resolves to
+    # the first column its compiled pattern matches
+    cols = list(df.columns)
+    df = df.rename(columns={
+        next((c for c in cols if pat.search(c)), None): field
+        for field, pat in FIELD_PATTERNS.items()
+    })
+
+    # Force create required columns (🔥 FIX)
+    for col, default in REQUIRED_COLUMNS.items():
+        if col not in df.columns:
+            df[col] = default
+
+    # Convert types safely — only strip thousands separators when the
+    # column actually came in as text, so clean numeric sheets skip the
+    # string round-trip entirely
+    for col in ("predicted", "confirmed", "accuracy"):
+        s = df[col]
+        if not pd.api.types.is_numeric_dtype(s):
+            s = s.astype("string").str.replace(",", "", regex=False)
+        df[col] = pd.to_numeric(s, errors="coerce", downcast="integer").fillna(0)
+
+    # 32-bit is plenty for counts and percentages; halves the bytes every
+    # downstream aggregation and serialization has to move
+    df["predicted"] = df["predicted"].astype("int32")
+    df["confirmed"] = df["confirmed"].astype("int32")
+    df["accuracy"] = df["accuracy"].astype("float32")
+    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    df["alert_date"] = pd.to_datetime(df["alert_date"], errors="coerce")
+
+    # Categoricals: groupby keys compare int codes instead of hashing strings
+    df["bank"] = df["bank"].astype("category")
+    df["model"] = df["model"].astype("category")
+    df["status"] = df["status"].astype("category")
+
+    # Banded once per data version; reruns and filters just slice it
+    df["band"] = pd.cut(df["accuracy"], bins=BAND_BINS, labels=BAND_LABELS,
+                        right=False)
+
+    # Threshold flag precomputed once; per-date slices just read the bools
+    df["is_critical"] = df["accuracy"] < ALERT_THRESHOLD
+
+    # Normalized once so the alert path does dict lookups, not per-row
+    # lower/replace/strip
+    df["bank_key"] = (df["bank"].astype(str).str.lower()
+                      .str.replace("bank", "", regex=False)
+                      .str.strip()).astype("category")
+
+    return df
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def load_mis(path, mtime):
+    # mtime keys the cache so saving new data invalidates it. A Parquet
+    # sidecar skips the xlsx parse entirely on warm process starts.
+    pq_path = os.path.splitext(path)[0] + ".parquet"
+    if os.path.exists(pq_path) and os.path.getmtime(pq_path) >= mtime:
+        return pd.read_parquet(pq_path)
+    df = _parse_excel(path)
+    try:
+        df.to_parquet(pq_path, compression="zstd")
+    except OSError:
+        pass  # read-only deployments still work straight off the xlsx
+    return df
+
+df = load_mis(FILE_PATH, os.path.getmtime(FILE_PATH))
 
-# Convert types safely
-df["predicted"] = pd.to_numeric(df["predicted"], errors="coerce").fillna(0)
-df["confirmed"] = pd.to_numeric(df["confirmed"], errors="coerce").fillna(0)
-df["accuracy"] = pd.to_numeric(df["accuracy"], errors="coerce").fillna(0)
-df["date"] = pd.to_datetime(df["date"], errors="coerce")
+# =====================================================
+# PENDING ROWS (avoid per-submit concat + full rewrite)
+# =====================================================
+if "new_rows" not in st.session_state:
+    st.session_state.new_rows = []
+
+if st.session_state.new_rows:
+    # One concat per rerun instead of one per submitted row
+    pending = pd.DataFrame(st.session_state.new_rows)
+    pending["date"] = pd.to_datetime(pending["date"], errors="coerce")
+    pending["alert_date"] = pd.to_datetime(pending["alert_date"],
+                                           errors="coerce")
+    # Band only the delta rows; the base frame is banded in the loader
+    pending["band"] = pd.cut(pending["accuracy"], bins=BAND_BINS,
+                             labels=BAND_LABELS, right=False)
+    pending["is_critical"] = pending["accuracy"] < ALERT_THRESHOLD
+    pending["bank_key"] = (pending["bank"].astype(str).str.lower()
+                           .str.replace("bank", "", regex=False)
+                           .str.strip())
+    df = pd.concat([df, pending], ignore_index=True)
 
 # =====================================================
 # SLA CALCULATION (SAFE)
 # =====================================================
-today = pd.to_datetime(date.today())
-df["sla_days"] = (today - pd.to_datetime(df["alert_date"], errors="coerce")).dt.days
-df["sla_days"] = df["sla_days"].fillna(0).astype(int)
+# alert_date is already datetime64 from the loader, so SLA is one typed
+# subtraction in day units — no per-rerun coercion pass
+alert_vals = df["alert_date"].to_numpy()
+sla = (np.datetime64(date.today()) - alert_vals.astype("datetime64[D]"))
+sla = sla.astype("int64")
+sla[np.isnat(alert_vals)] = 0
+df["sla_days"] = sla.astype("int32")
 
 # =====================================================
 # ADMIN – ADD / UPDATE BANK
@@ -121,29 +237,79 @@ if st.session_state.role == "Admin":
                 "status": status,
                 "alert_date": d if a < ALERT_THRESHOLD else pd.NaT
             }
-            df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
-            df.to_excel(FILE_PATH, index=False)
+            st.session_state.new_rows.append(new_row)
+            st.rerun()
+
+    if st.session_state.new_rows:
+        st.sidebar.info(f"{len(st.session_state.new_rows)} unsaved row(s)")
+        if st.sidebar.button("💾 Save to Excel"):
+            # Persist only the source fields; band/flags/keys/SLA are
+            # derived again by the loader. No constant_memory here: pandas
+            # writes cells column-by-column, which that mode silently drops.
+            out = df.drop(columns=["band", "is_critical", "bank_key",
+                                   "sla_days"], errors="ignore")
+            out.to_excel(FILE_PATH, index=False, engine="xlsxwriter")
+            # mtime keys the cache, but clear explicitly too so a save
+            # within the same mtime tick still reloads fresh data
+            load_mis.clear()
+            st.session_state.new_rows = []
             st.success("Data saved successfully")
             st.rerun()
 
 # =====================================================
 # DATE FILTER
 # =====================================================
+@st.cache_data(show_spinner=False)
+def unique_dates(df):
+    # Dedupe/sort in datetime64 space; only the handful of distinct days
+    # get boxed into Python date objects for the selectbox
+    days = np.unique(df["date"].dropna().values.astype("datetime64[D]"))[::-1]
+    return days.astype(object).tolist()
+
+@st.cache_data(show_spinner=False)
+def partition_by_date(df):
+    # Split the frame once per data version; each date pick is then a dict
+    # lookup instead of a fresh boolean-mask scan
+    return {day: part for day, part in df.groupby(df["date"].dt.normalize(),
+                                                  sort=False)}
+
 st.sidebar.markdown("## 📅 Date Filter")
-dates = sorted(df["date"].dropna().dt.date.unique(), reverse=True)
+dates = unique_dates(df)
 selected_date = st.sidebar.selectbox("Select Date", dates)
-filtered_df = df[df["date"].dt.date == selected_date]
+filtered_df = partition_by_date(df).get(pd.Timestamp(selected_date), df.iloc[0:0])
 
 # =====================================================
 # KPIs
 # =====================================================
 st.title("📊 RBIH MIS Dashboard")
 
+# Single per-bank aggregation shared by the KPI row and the bar chart,
+# precomputed for every day in one grouped pass and looked up per rerun
+@st.cache_data(show_spinner=False)
+def daily_bank_agg(df):
+    agg = df.groupby([df["date"].dt.normalize(), "bank"],
+                     observed=True, sort=False).agg(
+        predicted=("predicted", "sum"),
+        confirmed=("confirmed", "sum"),
+        accuracy=("accuracy", "mean")
+    )
+    return {day: part.droplevel(0) for day, part in agg.groupby(level=0, sort=False)}
+
+bank_agg = daily_bank_agg(df).get(
+    pd.Timestamp(selected_date),
+    pd.DataFrame(columns=["predicted", "confirmed", "accuracy"]).rename_axis("bank")
+)
+
+# Materialize the accuracy buffer once for the mean; the critical flag is
+# precomputed at load, so the count and the alerts table just read the bools
+acc = filtered_df["accuracy"].to_numpy()
+crit_mask = filtered_df["is_critical"].to_numpy()
+
 k1, k2, k3, k4 = st.columns(4)
-k1.metric("Total Predicted", int(filtered_df["predicted"].sum()))
-k2.metric("Total Confirmed", int(filtered_df["confirmed"].sum()))
-k3.metric("Avg Accuracy", f"{filtered_df['accuracy'].mean():.2f}%")
-k4.metric("Critical Models", int((filtered_df["accuracy"] < ALERT_THRESHOLD).sum()))
+k1.metric("Total Predicted", int(bank_agg["predicted"].sum()))
+k2.metric("Total Confirmed", int(bank_agg["confirmed"].sum()))
+k3.metric("Avg Accuracy", f"{acc.mean():.2f}%")
+k4.metric("Critical Models", int(crit_mask.sum()))
 
 # =====================================================
 # EMAIL CONFIG
@@ -153,31 +319,61 @@ EMAIL_MAP = {
     "hdfc": "manishroyalkondeti43@gmail.com"
 }
 
-def normalize_bank(b):
-    return b.lower().replace("bank", "").strip()
-
-def send_alert(row):
-    key = normalize_bank(row["bank"])
-    if key not in EMAIL_MAP:
-        return f"No email mapping for {row['bank']}"
-
-    sender = st.secrets["EMAIL_ADDRESS"]
-    password = st.secrets["EMAIL_PASSWORD"]
-    receiver = EMAIL_MAP[key]
-    spoc = st.secrets.get("RBIH_SPOC_EMAIL", "")
+@st.cache_resource(show_spinner=False)
+def _email_config():
+    # Resolve the secrets proxy once per process; the send loop reuses the
+    # same credentials and CC for every alert row
+    return (st.secrets["EMAIL_ADDRESS"], st.secrets["EMAIL_PASSWORD"],
+            st.secrets.get("RBIH_SPOC_EMAIL", ""))
+
+@st.cache_resource(show_spinner=False)
+def _smtp_state():
+    # Holder for the worker-owned SMTP session. Kept out of session_state
+    # so the script thread never touches the socket while the worker is
+    # mid-send
+    return {}
+
+@st.cache_resource(show_spinner=False)
+def _smtp_executor():
+    # Single background worker: the dashboard paints immediately while the
+    # queued emails drain through the shared SMTP session one by one
+    from concurrent.futures import ThreadPoolExecutor
+    return ThreadPoolExecutor(max_workers=1)
+
+def _get_smtp(state, sender, password):
+    # Runs on the worker thread only, which owns the socket exclusively.
+    # Imported lazily: most reruns never touch SMTP, so the module import
+    # stays off the hot path
+    import smtplib
+
+    # One authenticated session reused across the batch and across reruns;
+    # a TLS+AUTH handshake per alert row costs hundreds of ms each
+    server = state.get("conn")
+    if server is not None:
+        try:
+            server.noop()
+            return server
+        except (smtplib.SMTPException, OSError):
+            pass  # stale connection — reconnect below
+    server = smtplib.SMTP("smtp.gmail.com", 587)
+    server.starttls()
+    server.login(sender, password)
+    state["conn"] = server
+    return server
 
-    subject = f"⚠️ Model Performance Alert – Accuracy Below Threshold | {row['bank']}"
+# Static alert text built once at import; send_alert only fills the fields
+ALERT_SUBJECT = "⚠️ Model Performance Alert – Accuracy Below Threshold | {bank}"
 
-    body = f"""
-Dear {row['bank']} Analytics Team,
+ALERT_BODY = """
+Dear {bank} Analytics Team,
 
 As part of RBIH’s continuous model performance monitoring under the MuleHunter.AI program,
 we have observed a decline in the performance of one of your deployed models.
 
-📌 Bank Name       : {row['bank']}
-📌 Model Name      : {row['model']}
-📌 Current Accuracy: {row['accuracy']:.2f}%
-📌 Reporting Date  : {row['date'].date()}
+📌 Bank Name       : {bank}
+📌 Model Name      : {model}
+📌 Current Accuracy: {accuracy:.2f}%
+📌 Reporting Date  : {report_date}
 
 ⚠️ Observation:
 The model accuracy has fallen below the acceptable operational threshold of 40%.
@@ -197,19 +393,27 @@ RBIH Analytics Governance Team
 Reserve Bank Innovation Hub (RBIH)
 """
 
-    msg = MIMEMultipart()
+def send_alert(bank, receiver, model, accuracy, report_date, smtp_state,
+               sender, password, spoc):
+    from email.message import EmailMessage
+
+    server = _get_smtp(smtp_state, sender, password)
+
+    subject = ALERT_SUBJECT.format(bank=bank)
+    body = ALERT_BODY.format(bank=bank, model=model, accuracy=accuracy,
+                             report_date=pd.Timestamp(report_date).date())
+
+    # Single-part message: no multipart boundary generation or per-part
+    # header re-tokenization per alert
+    msg = EmailMessage()
     msg["From"] = sender
     msg["To"] = receiver
     if spoc:
         msg["Cc"] = spoc
     msg["Subject"] = subject
-    msg.attach(MIMEText(body, "plain"))
+    msg.set_content(body)
 
-    server = smtplib.SMTP("smtp.gmail.com", 587)
-    server.starttls()
-    server.login(sender, password)
     server.send_message(msg)
-    server.quit()
 
     return f"✅ Alert email sent successfully to {receiver}"
 
@@ -219,53 +423,177 @@ Reserve Bank Innovation Hub (RBIH)
 # =====================================================
 st.markdown("## 🚨 Critical Alerts & SLA Tracking")
 
-alerts = filtered_df[filtered_df["accuracy"] < ALERT_THRESHOLD]
-
 DISPLAY_COLS = ["bank", "model", "accuracy", "status", "sla_days"]
 
-for col in DISPLAY_COLS:
-    if col not in alerts.columns:
-        alerts[col] = "N/A"
-
-if alerts.empty:
+# Cheap short-circuit: skip materializing the alerts frame entirely on the
+# common no-critical-models path
+if not crit_mask.any():
     st.success("No critical alerts 🎉")
 else:
+    alerts = filtered_df[crit_mask]
+
+    for col in DISPLAY_COLS:
+        if col not in alerts.columns:
+            alerts[col] = "N/A"
+
     st.dataframe(alerts[DISPLAY_COLS], use_container_width=True)
 
     if st.button("📧 Send Alert Emails"):
-        for _, r in alerts.iterrows():
-            st.success(send_alert(r))
+        sender, password, spoc = _email_config()
+        smtp_state = _smtp_state()
+        sent = st.session_state.setdefault("sent_alerts", set())
+        # Fresh batch: outcomes land here from the worker and render on
+        # the next rerun
+        results = st.session_state.alert_results = []
+        today_key = date.today()
+        queued, skipped = [], []
+        # Gate the whole frame in two vectorized masks instead of probing
+        # the sent-set and email map row by row inside the loop
+        already_today = {b for b, d in sent if d == today_key}
+        dup_mask = alerts["bank"].isin(already_today).to_numpy()
+        mapped_mask = alerts["bank_key"].isin(list(EMAIL_MAP)).to_numpy()
+        for bank in alerts.loc[dup_mask, "bank"]:
+            skipped.append(f"⏭️ {bank} already alerted today — skipped")
+        for bank in alerts.loc[~dup_mask & ~mapped_mask, "bank"]:
+            skipped.append(f"No email mapping for {bank}")
+        todo = alerts[~dup_mask & mapped_mask]
+        # Resolve recipients in one vectorized map; the loop only dispatches
+        receivers = todo["bank_key"].map(EMAIL_MAP).to_numpy()
+
+        def _record(bank):
+            # Runs on the worker thread: mutate the captured containers,
+            # not the session-state proxy. The dedup key is only added on
+            # success so a failed alert can be retried the same day.
+            def _done(fut):
+                err = fut.exception()
+                if err is None:
+                    sent.add((bank, today_key))
+                    results.append(fut.result())
+                else:
+                    results.append(f"❌ {bank}: {err}")
+            return _done
+
+        # zip over the raw column buffers — no per-row Series construction
+        for bank, receiver, model, accuracy, report_date in zip(
+            todo["bank"].to_numpy(),
+            receivers,
+            todo["model"].to_numpy(),
+            todo["accuracy"].to_numpy(),
+            todo["date"].to_numpy()
+        ):
+            # Hand the send to the background worker so the rerun doesn't
+            # block on SMTP round-trips
+            fut = _smtp_executor().submit(send_alert, bank, receiver, model,
+                                          accuracy, report_date, smtp_state,
+                                          sender, password, spoc)
+            fut.add_done_callback(_record(str(bank)))
+            queued.append(str(bank))
+        if queued:
+            st.info(f"📨 Queued alert emails for: {', '.join(queued)}")
+        if skipped:
+            st.warning("\n\n".join(skipped))
+
+    # Outcomes reported by the background worker (from this click or the
+    # previous one) surface here on rerun
+    for line in st.session_state.get("alert_results", ()):
+        (st.success if line.startswith("✅") else st.error)(line)
 
 # =====================================================
-# VISUALS
+# VISUALS (figure builders memoized on their input frames)
 # =====================================================
-st.markdown("## 🏦 Predicted vs Confirmed")
-st.plotly_chart(
-    px.bar(
-        filtered_df.groupby("bank")[["predicted", "confirmed"]].sum().reset_index(),
-        x="bank",
-        y=["predicted", "confirmed"],
-        barmode="group"
-    ),
-    use_container_width=True
-)
-
-st.markdown("## 🎯 Performance Bands")
-filtered_df["band"] = filtered_df["accuracy"].apply(
-    lambda x: "High" if x >= 70 else "Medium" if x >= 50 else "Low"
-)
-
-st.plotly_chart(px.pie(filtered_df, names="band", hole=0.5),
-                use_container_width=True)
-
-st.markdown("## 📉 Month-over-Month Trend")
-trend = df.groupby(df["date"].dt.to_period("M"))["accuracy"].mean().reset_index()
-trend["date"] = trend["date"].astype(str)
-st.plotly_chart(px.line(trend, x="date", y="accuracy", markers=True),
-                use_container_width=True)
+@st.cache_resource(max_entries=32, show_spinner=False)
+def build_bank_bar(long_summary):
+    return px.bar(long_summary, x="bank", y="count", color="type",
+                  barmode="group")
+
+@st.cache_resource(max_entries=32, show_spinner=False)
+def build_band_pie(band_counts):
+    return px.pie(band_counts, names="band", values="count", hole=0.5)
+
+@st.cache_resource(max_entries=32, show_spinner=False)
+def build_trend_line(trend):
+    # webgl render keeps the line cheap in the browser if the trend grows
+    return px.line(trend, x="date", y="accuracy", markers=True,
+                   render_mode="webgl")
+
+# Each section is a fragment so a widget inside one does not force the
+# sibling charts (or the rest of the script) to rerender
+@st.fragment
+def render_bank_chart(bank_agg):
+    st.markdown("## 🏦 Predicted vs Confirmed")
+    # int32 sums halve the serialized chart payload vs the default int64
+    bank_summary = (bank_agg[["predicted", "confirmed"]]
+                    .sort_values("predicted", ascending=False)
+                    .astype("int32")
+                    .reset_index())
+    # Melt once ourselves rather than letting px.bar do it per call
+    long_summary = bank_summary.melt(id_vars="bank", var_name="type",
+                                     value_name="count")
+    st.plotly_chart(build_bank_bar(long_summary), use_container_width=True)
+
+@st.fragment
+def render_band_pie(band):
+    st.markdown("## 🎯 Performance Bands")
+    # One bincount over the int8 band codes; the pie gets three rows instead
+    # of re-grouping the raw frame
+    codes = band.cat.codes.to_numpy()
+    band_counts = pd.DataFrame({
+        "band": band.cat.categories,
+        "count": np.bincount(codes[codes >= 0], minlength=3)
+    })
+    st.plotly_chart(build_band_pie(band_counts), use_container_width=True)
+
+@st.cache_data(show_spinner=False)
+def monthly_trend(df):
+    # Group on the raw datetime64[M] buffer — no PeriodIndex boxing, and the
+    # groupby returns the months already sorted. Cached: the trend only
+    # changes when the underlying data does, not per date-filter change.
+    month_acc = df["accuracy"].groupby(df["date"].values.astype("datetime64[M]")).mean()
+    return pd.DataFrame({
+        "date": pd.DatetimeIndex(month_acc.index).strftime("%Y-%m"),
+        "accuracy": month_acc.values
+    })
+
+@st.fragment
+def render_trend(df):
+    st.markdown("## 📉 Month-over-Month Trend")
+    st.plotly_chart(build_trend_line(monthly_trend(df)), use_container_width=True)
+
+render_bank_chart(bank_agg)
+render_band_pie(filtered_df["band"])
+render_trend(df)
 
 # =====================================================
 # TABLE
 # =====================================================
-st.markdown("## 📋 Detailed MIS Data")
-st.dataframe(filtered_df, use_container_width=True)
+@st.cache_data(show_spinner=False)
+def to_csv_bytes(df):
+    # PyArrow's C++ CSV writer; cached so reruns reuse the encoded bytes
+    import io
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    buf = io.BytesIO()
+    pa_csv.write_csv(pa.Table.from_pandas(df, preserve_index=False), buf)
+    return buf.getvalue()
+
+@st.fragment
+def render_table(filtered_df):
+    st.markdown("## 📋 Detailed MIS Data")
+    # Downcast the display copy — the table is read-only, so int32/float32
+    # halve the serialized payload without losing anything visible
+    display = filtered_df[["bank", "model", "predicted", "confirmed",
+                           "accuracy", "status", "band", "sla_days", "date"]].head(200).copy()
+    display[["predicted", "confirmed"]] = display[["predicted", "confirmed"]].astype("int32")
+    display["accuracy"] = display["accuracy"].astype("float32")
+    st.dataframe(display, use_container_width=True)
+    if len(filtered_df) > 200:
+        st.caption(f"Showing first 200 of {len(filtered_df)} rows — "
+                   "use the CSV download for the full set")
+    st.download_button(
+        "⬇️ Download CSV",
+        to_csv_bytes(filtered_df),
+        file_name="mis_report.csv",
+        mime="text/csv"
+    )
+
+render_table(filtered_df)